@@ -0,0 +1,106 @@
+"""Compare sustained insert throughput and primary key index size for uuid4 and UUIDv7 keys.
+
+Each key version gets its own table shaped like "Tasks", and the versions run in random order.
+Rows are inserted in batches and throughput is reported per tenth of the run, so slowdowns
+appear once the index outgrows memory. Key generation is not included in the timings.
+
+    python -m benchmarks.bench_uuid_keys --rows 5000000
+    python -m benchmarks.bench_uuid_keys --url sqlite+aiosqlite:///bench.db --rows 200000
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Uuid, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.database import ASYNC_DATABASE_URL
+from src.ids import uuid7
+
+KEY_FACTORIES = {"uuid4": uuid4, "uuid7": uuid7}
+
+
+def bench_table(metadata: MetaData, version: str) -> Table:
+    return Table(
+        f"bench_tasks_{version}",
+        metadata,
+        Column("uuid", Uuid, primary_key=True),
+        Column("title", String(255), nullable=False),
+        Column("status", String, nullable=False),
+        Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    )
+
+
+async def index_size(conn: AsyncConnection, table: Table) -> Optional[int]:
+    if conn.dialect.name == "postgresql":
+        result = await conn.execute(
+            text("SELECT pg_relation_size(indexrelid) FROM pg_index WHERE indrelid = CAST(:table AS regclass)"),
+            {"table": table.name},
+        )
+        return result.scalar_one()
+    if conn.dialect.name == "sqlite":
+        result = await conn.execute(
+            text("SELECT SUM(pgsize) FROM dbstat WHERE name = :index"),
+            {"index": f"sqlite_autoindex_{table.name}_1"},
+        )
+        return result.scalar_one()
+    return None
+
+
+async def run(url: str, rows: int, batch_size: int) -> None:
+    engine = create_async_engine(url)
+    metadata = MetaData()
+    tables = {version: bench_table(metadata, version) for version in KEY_FACTORIES}
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+
+    # Random order, so neither version consistently runs on a cold or a warm cache
+    versions = random.sample(list(KEY_FACTORIES), len(KEY_FACTORIES))
+    for version in versions:
+        new_key = KEY_FACTORIES[version]
+        table = tables[version]
+        report_every = max(rows // 10, batch_size)
+        elapsed = checkpoint = 0.0
+        inserted = reported = 0
+
+        print(f"\n{version}: inserting {rows} rows in batches of {batch_size}")
+        while inserted < rows:
+            count = min(batch_size, rows - inserted)
+            # Keys are generated before timing, only the inserts are measured
+            batch = [{"uuid": new_key(), "title": f"Task {inserted + i}", "status": "created"} for i in range(count)]
+            started = time.perf_counter()
+            async with engine.begin() as conn:
+                await conn.execute(insert(table), batch)
+            elapsed += time.perf_counter() - started
+            inserted += count
+
+            if inserted - reported >= report_every or inserted == rows:
+                print(f"  {inserted:>12} rows  {(inserted - reported) / (elapsed - checkpoint):>12.0f} rows/s")
+                reported, checkpoint = inserted, elapsed
+
+        async with engine.connect() as conn:
+            size = await index_size(conn, table)
+        size_text = f"{size / 2 ** 20:.1f} MiB" if size is not None else "n/a"
+        print(f"  total {elapsed:.1f} s, {rows / elapsed:.0f} rows/s, primary key index {size_text}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=ASYNC_DATABASE_URL, help="async SQLAlchemy database URL")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.rows, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,61 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, case, cast, func, literal, Integer, Text, literal_column
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.dialects import postgresql, sqlite
 from uuid import UUID
+from datetime import datetime, timezone
 from typing import Optional
+from collections import Counter
 
 from src.schemas import TaskCreate, TaskUpdate
-from src.models import Task
+from src.models import Task, Tag, OPEN_TASK, TaskStatus, task_tags
+from src.scheduler import DeadlineScheduler
+
+
+MAX_TREE_DEPTH = 1000
+DEFAULT_PAGE_SIZE = 100
+# Dialects providing INSERT ... ON CONFLICT DO NOTHING
+UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
+
+
+def subtree_status_counts(nodes: list[tuple[Task, int, Counter]]) -> dict[UUID, Counter]:
+    """Aggregate task statuses of every subtree, walking the nodes from the deepest level up.
+
+    Each node comes with the status counts of its descendants below the depth limit,
+    so the totals cover the whole subtree and not only the returned nodes.
+    """
+    counts = {}
+    for task, _, hidden in nodes:
+        counts[task.uuid] = Counter({status: 0 for status in TaskStatus})
+        counts[task.uuid].update(hidden)
+    for task, depth, _ in sorted(nodes, key=lambda node: node[1], reverse=True):
+        counts[task.uuid][TaskStatus(task.status)] += 1
+        if depth > 0:
+            counts[task.parent_uuid].update(counts[task.uuid])
+    return counts
 
 
 class TaskCRUD:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, scheduler: Optional[DeadlineScheduler] = None):
         self.session = session
+        self.scheduler = scheduler
 
     async def create_task(self, task_data: TaskCreate) -> Task:
+        if task_data.parent_uuid is not None and await self.get_task(task_data.parent_uuid) is None:
+            raise ValueError("Parent task not found")
+
         new_task = Task(title=task_data.title,
                         description=task_data.description,
-                        status=task_data.status)
+                        status=task_data.status,
+                        due_at=task_data.due_at,
+                        parent_uuid=task_data.parent_uuid)
+        if task_data.tags:
+            new_task.tags = await self._get_or_create_tags(task_data.tags)
         self.session.add(new_task)
         await self.session.commit()
         await self.session.refresh(new_task)
+        if self.scheduler is not None:
+            self.scheduler.schedule(new_task)
         return new_task
 
     async def get_task(self, task_uuid: UUID) -> Optional[Task]:
@@ -26,8 +64,37 @@ class TaskCRUD:
         )
         return result.scalar_one_or_none()
 
-    async def get_tasks(self) -> list[Task]:
+    async def get_tasks(
+            self,
+            overdue: bool = False,
+            tags: Optional[list[str]] = None,
+            match_all_tags: bool = False,
+            after: Optional[UUID] = None,
+            limit: Optional[int] = None
+    ) -> list[Task]:
         query = select(Task)
+        if tags:
+            tagged = (
+                select(task_tags.c.task_uuid)
+                .join(Tag, Tag.id == task_tags.c.tag_id)
+                .where(Tag.name.in_(tags))
+            )
+            if match_all_tags:
+                tagged = (
+                    tagged
+                    .group_by(task_tags.c.task_uuid)
+                    .having(func.count() == len(set(tags)))
+                )
+            query = query.where(Task.uuid.in_(tagged))
+        if overdue:
+            query = query.where(OPEN_TASK, Task.due_at < datetime.now(timezone.utc))
+        if after is not None or limit is not None:
+            # Keyset pagination on the primary key, chronological for UUIDv7 keys
+            if after is not None:
+                query = query.where(Task.uuid > after)
+            query = query.order_by(Task.uuid).limit(limit or DEFAULT_PAGE_SIZE)
+        elif overdue:
+            query = query.order_by(Task.due_at)
         results = await self.session.execute(query)
         return list(results.scalars().all())
 
@@ -37,22 +104,178 @@ class TaskCRUD:
             task_update: TaskUpdate
     ) -> Optional[Task]:
         update_data = task_update.model_dump(exclude_unset=True)
-        if not update_data:
+        tags = update_data.pop("tags", None)
+        if not update_data and tags is None:
             return await self.get_task(task_uuid)
 
-        stmt = (
-            update(Task)
+        if update_data.get("parent_uuid") is not None:
+            await self._check_parent(task_uuid, update_data["parent_uuid"])
+
+        if update_data:
+            stmt = (
+                update(Task)
+                .where(Task.uuid == task_uuid)
+                .values(**update_data)
+                .returning(Task)
+            )
+            result = await self.session.execute(stmt)
+            task = result.scalar_one_or_none()
+        else:
+            task = await self.get_task(task_uuid)
+
+        if task is not None and tags is not None:
+            task.tags = await self._get_or_create_tags(tags)
+        await self.session.commit()
+        if task is not None and self.scheduler is not None:
+            self.scheduler.schedule(task)
+        return task
+
+    async def get_subtree(
+            self,
+            task_uuid: UUID,
+            max_depth: int = MAX_TREE_DEPTH
+    ) -> list[tuple[Task, int, Counter]]:
+        """Get a task and its descendants down to max_depth with one recursive query.
+
+        The root comes first, followed by the descendants ordered by depth. Every node
+        carries the status counts of its descendants deeper than max_depth; these are
+        only non-empty for nodes at the cutoff.
+        """
+        # The whole subtree is walked; rows below the cutoff keep their ancestor at
+        # max_depth as anchor and are only returned as per-anchor status counts
+        tree = (
+            select(
+                Task.uuid,
+                Task.status,
+                literal_column("0", Integer).label("depth"),
+                Task.uuid.label("anchor"),
+                cast(Task.uuid, Text).label("visited")
+            )
             .where(Task.uuid == task_uuid)
-            .values(**update_data)
-            .returning(Task)
+            .cte("subtree", recursive=True)
+        )
+        child = aliased(Task)
+        tree = tree.union_all(
+            select(
+                child.uuid,
+                child.status,
+                tree.c.depth + 1,
+                case((tree.c.depth < max_depth, child.uuid), else_=tree.c.anchor),
+                tree.c.visited + literal("/", Text) + cast(child.uuid, Text)
+            )
+            .where(
+                child.parent_uuid == tree.c.uuid,
+                tree.c.depth < MAX_TREE_DEPTH,
+                # Stop at a task already on the path, so a corrupted tree is not walked in circles
+                ~tree.c.visited.contains(cast(child.uuid, Text))
+            )
+        )
+        hidden = (
+            select(
+                tree.c.anchor,
+                *(
+                    func.sum(case(
+                        (tree.c.status == status.value, literal_column("1", Integer)),
+                        else_=literal_column("0", Integer)
+                    )).label(status.value)
+                    for status in TaskStatus
+                )
+            )
+            .where(tree.c.depth > max_depth)
+            .group_by(tree.c.anchor)
+            .subquery("hidden")
         )
+        # Tags are joined rather than selectin-loaded, keeping large trees at one round trip
+        result = await self.session.execute(
+            select(Task, tree.c.depth, *(hidden.c[status.value] for status in TaskStatus))
+            .join(tree, Task.uuid == tree.c.uuid)
+            .outerjoin(hidden, hidden.c.anchor == Task.uuid)
+            .where(tree.c.depth <= max_depth)
+            .options(joinedload(Task.tags))
+            .order_by(tree.c.depth)
+        )
+        return [
+            (task, depth, Counter({status: count or 0 for status, count in zip(TaskStatus, hidden_counts)}))
+            for task, depth, *hidden_counts in result.unique().all()
+        ]
 
-        result = await self.session.execute(stmt)
-        await self.session.commit()
-        return result.scalar_one_or_none()
+    async def get_path(self, task_uuid: UUID) -> list[Task]:
+        """Get the chain of tasks from the root down to the given task with one recursive query"""
+        path = self._path_cte(task_uuid)
+        result = await self.session.execute(
+            select(Task)
+            .join(path, Task.uuid == path.c.uuid)
+            .options(joinedload(Task.tags))
+            .order_by(path.c.depth.desc())
+        )
+        return list(result.unique().scalars().all())
+
+    @staticmethod
+    def _path_cte(task_uuid: UUID):
+        path = (
+            select(
+                Task.uuid,
+                Task.parent_uuid,
+                literal_column("0", Integer).label("depth"),
+                cast(Task.uuid, Text).label("visited")
+            )
+            .where(Task.uuid == task_uuid)
+            .cte("path", recursive=True)
+        )
+        parent = aliased(Task)
+        return path.union_all(
+            select(
+                parent.uuid,
+                parent.parent_uuid,
+                path.c.depth + 1,
+                path.c.visited + literal("/", Text) + cast(parent.uuid, Text)
+            )
+            .where(
+                parent.uuid == path.c.parent_uuid,
+                path.c.depth < MAX_TREE_DEPTH,
+                ~path.c.visited.contains(cast(parent.uuid, Text))
+            )
+        )
+
+    async def _get_or_create_tags(self, names: list[str]) -> list[Tag]:
+        result = await self.session.execute(select(Tag).where(Tag.name.in_(names)))
+        tags = {tag.name: tag for tag in result.scalars().all()}
+        missing = [name for name in names if name not in tags]
+        if missing:
+            # Concurrent requests may add the same tag; let the unique index settle it
+            dialect = self.session.get_bind().dialect.name
+            if dialect not in UPSERT_DIALECTS:
+                raise NotImplementedError(f"Creating tags is not supported on {dialect}")
+            insert = UPSERT_DIALECTS[dialect].insert
+            await self.session.execute(
+                insert(Tag)
+                .values([{"name": name} for name in missing])
+                .on_conflict_do_nothing(index_elements=[Tag.name])
+            )
+            result = await self.session.execute(select(Tag).where(Tag.name.in_(missing)))
+            tags.update((tag.name, tag) for tag in result.scalars().all())
+        return [tags[name] for name in names]
+
+    async def _check_parent(self, task_uuid: UUID, parent_uuid: UUID) -> None:
+        # The moved task and its new ancestors are locked until commit, so two moves that
+        # would close a cycle together (A under B, B under A) wait for each other
+        await self.session.execute(select(Task.uuid).where(Task.uuid == task_uuid).with_for_update())
+        path = self._path_cte(parent_uuid)
+        result = await self.session.execute(
+            select(Task.uuid)
+            .join(path, Task.uuid == path.c.uuid)
+            .with_for_update(of=Task)
+        )
+        ancestors = set(result.scalars().all())
+        if not ancestors:
+            raise ValueError("Parent task not found")
+        if task_uuid in ancestors:
+            raise ValueError("Task cannot be moved under its own subtree")
 
     async def delete_task(self, task_uuid: UUID) -> bool:
         stmt = delete(Task).where(Task.uuid == task_uuid)
         result = await self.session.execute(stmt)
         await self.session.commit()
+        if self.scheduler is not None:
+            self.scheduler.unschedule(task_uuid)
         return result.returns_rows
@@ -1,6 +1,27 @@
-from fastapi import Depends
+import os
+import secrets
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
 
 from . import crud, database
+from .scheduler import deadline_scheduler
 
 async def get_task_crud(db: database.AsyncSession = Depends(database.get_db)):
-    return crud.TaskCRUD(db)
\ No newline at end of file
+    return crud.TaskCRUD(db, deadline_scheduler)
+
+
+def debug_enabled() -> bool:
+    return bool(os.getenv("DEBUG_TOKEN"))
+
+
+def is_valid_debug_token(token: Optional[str]) -> bool:
+    expected = os.getenv("DEBUG_TOKEN")
+    return bool(expected) and token is not None and secrets.compare_digest(token, expected)
+
+
+async def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    if not debug_enabled():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_valid_debug_token(x_debug_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid debug token")
@@ -0,0 +1,176 @@
+import logging
+import os
+import re
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_request_queries: ContextVar[Optional[Counter]] = ContextVar("request_queries", default=None)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so that queries differing only in parameters compare equal"""
+    normalized = _PLACEHOLDER.sub("?", statement)
+    normalized = _PLACEHOLDER_LIST.sub("?", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def parameters_shape(parameters: Any) -> Any:
+    """Describe parameters by type only, so values never end up in the logs"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [parameters_shape(value) if isinstance(value, (dict, list, tuple)) else type(value).__name__
+                for value in parameters]
+    return type(parameters).__name__
+
+
+class QueryDiagnostics:
+    """Slow-query log and N+1 detector driven by SQLAlchemy engine events"""
+
+    def __init__(
+            self,
+            slow_query_threshold_ms: float = 200.0,
+            explain: bool = False,
+            n_plus_one_threshold: int = 10,
+            max_records: int = 100
+    ):
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.explain = explain
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_queries: deque = deque(maxlen=max_records)
+        self.n_plus_one_warnings: deque = deque(maxlen=max_records)
+
+    @classmethod
+    def from_env(cls) -> "QueryDiagnostics":
+        return cls(
+            slow_query_threshold_ms=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")),
+            explain=os.getenv("SLOW_QUERY_EXPLAIN", "false").lower() in ("1", "true", "yes"),
+            n_plus_one_threshold=int(os.getenv("N_PLUS_ONE_THRESHOLD", "10")),
+        )
+
+    def install(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def uninstall(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        event.remove(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(sync_engine, "handle_error", self._handle_error)
+
+    @contextmanager
+    def track_request(self, label: str):
+        """Count statements issued inside the block and warn about repeated ones"""
+        queries = Counter()
+        token = _request_queries.set(queries)
+        try:
+            yield queries
+        finally:
+            _request_queries.reset(token)
+            for statement, count in queries.items():
+                if count > self.n_plus_one_threshold:
+                    logger.warning(
+                        "Possible N+1: %s ran %d similar statements: %s", label, count, statement
+                    )
+                    self.n_plus_one_warnings.append({
+                        "request": label,
+                        "statement": statement,
+                        "count": count,
+                        "recorded_at": datetime.now(timezone.utc),
+                    })
+
+    def snapshot(self) -> dict:
+        return {
+            "slow_query_threshold_ms": self.slow_query_threshold_ms,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "slow_queries": list(self.slow_queries),
+            "n_plus_one_warnings": list(self.n_plus_one_warnings),
+        }
+
+    def reset(self) -> None:
+        self.slow_queries.clear()
+        self.n_plus_one_warnings.clear()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[fingerprint(statement)] += 1
+
+        if duration_ms < self.slow_query_threshold_ms:
+            return
+
+        plan = self._explain(conn, statement, parameters) if self.explain and not executemany else None
+        logger.warning("Slow query (%.1f ms): %s", duration_ms, statement)
+        self.slow_queries.append({
+            "statement": statement,
+            "parameters": parameters_shape(parameters),
+            "duration_ms": round(duration_ms, 3),
+            "plan": plan,
+            "recorded_at": datetime.now(timezone.utc),
+        })
+
+    def _handle_error(self, context) -> None:
+        # after_cursor_execute is skipped for failed statements, drop their start time here
+        start_times = context.connection.info.get("query_start_time") if context.connection is not None else None
+        if start_times:
+            start_times.pop()
+
+    def _explain(self, conn: Connection, statement: str, parameters: Any) -> Optional[list[str]]:
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            # ANALYZE executes the statement again; DML is skipped and anything else
+            # (e.g. data-modifying CTEs) is undone by rolling back to the savepoint below
+            if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                return None
+            if not conn.in_transaction():
+                return None
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        elif dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            return None
+
+        # A separate DBAPI cursor keeps the rows of the original statement unread,
+        # and bypasses the engine events so the plan is not counted as a query
+        cursor = conn.connection.dbapi_connection.cursor()
+        use_savepoint = dialect == "postgresql"
+        try:
+            if use_savepoint:
+                cursor.execute("SAVEPOINT query_diagnostics_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            finally:
+                if use_savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT query_diagnostics_explain")
+                    cursor.execute("RELEASE SAVEPOINT query_diagnostics_explain")
+        except Exception:
+            logger.exception("Failed to capture query plan")
+            return None
+        finally:
+            cursor.close()
+        return [" ".join(str(column) for column in row) for row in rows]
+
+
+query_diagnostics = QueryDiagnostics.from_env()
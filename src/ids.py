@@ -0,0 +1,54 @@
+import os
+import secrets
+import threading
+import time
+from uuid import UUID, uuid4
+
+SUPPORTED_UUID_VERSIONS = {4, 7}
+
+
+def _task_uuid_version() -> int:
+    value = os.getenv("TASK_UUID_VERSION", "4").strip()
+    if not value.isdigit() or int(value) not in SUPPORTED_UUID_VERSIONS:
+        raise ValueError(f"TASK_UUID_VERSION must be 4 or 7, got {value!r}")
+    return int(value)
+
+
+TASK_UUID_VERSION = _task_uuid_version()
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> UUID:
+    """Generate a time-ordered UUID version 7 (RFC 9562).
+
+    48 bits of Unix time in milliseconds are followed by a 12-bit counter and 62 random bits.
+    The counter starts at a random value every millisecond and is incremented for ids
+    generated within the same millisecond, so ids from one process are strictly increasing.
+    """
+    global _last_ms, _counter
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_ms:
+            _last_ms = timestamp_ms
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = secrets.randbits(11)
+        timestamp_ms, counter = _last_ms, _counter
+
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= secrets.randbits(62)
+    return UUID(int=value)
+
+
+def new_task_uuid() -> UUID:
+    """Primary key factory for new tasks, uuid4 unless TASK_UUID_VERSION=7"""
+    return uuid7() if TASK_UUID_VERSION == 7 else uuid4()
@@ -1,10 +1,20 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from typing import List, Optional
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
 import uuid
 
-from src.dependencies import get_task_crud
-from src.schemas import TaskResponse, TaskCreate, TaskUpdate
-from src.crud import TaskCRUD
+from src.dependencies import get_task_crud, require_debug_token, is_valid_debug_token
+from src.schemas import TaskResponse, TaskCreate, TaskUpdate, TaskTreeNode, QueryDiagnosticsResponse, normalize_tags
+from src.crud import TaskCRUD, MAX_TREE_DEPTH, subtree_status_counts
+from src.diagnostics import query_diagnostics
+from src.scheduler import deadline_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await deadline_scheduler.start()
+    yield
+    await deadline_scheduler.stop()
 
 
 app = FastAPI(
@@ -12,9 +22,18 @@ app = FastAPI(
     description="A simple task management API with CRUD operations",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+@app.middleware("http")
+async def track_request_queries(request: Request, call_next):
+    with query_diagnostics.track_request(f"{request.method} {request.url.path}") as queries:
+        response = await call_next(request)
+    if is_valid_debug_token(request.headers.get("X-Debug-Token")):
+        response.headers["X-Query-Count"] = str(sum(queries.values()))
+    return response
+
 @app.get("/")
 async def root():
     return {"message": "Task Manager API"}
@@ -25,14 +44,35 @@ async def create_task(
     task_crud: TaskCRUD = Depends(get_task_crud)
 ):
     """Create a new task"""
-    return await task_crud.create_task(task)
+    try:
+        return await task_crud.create_task(task)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(error)
+        )
 
 @app.get("/tasks/", response_model=List[TaskResponse])
 async def read_tasks(
+    overdue: bool = False,
+    tags: Optional[List[str]] = Query(None),
+    tag_match: Literal["any", "all"] = "any",
+    after: Optional[uuid.UUID] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     task_crud: TaskCRUD = Depends(get_task_crud)
 ):
-    """Get list of tasks"""
-    tasks = await task_crud.get_tasks()
+    """Get list of tasks, optionally only open tasks past their deadline or tasks with any/all of the given tags.
+
+    With `after` or `limit` tasks are ordered by UUID, `limit` defaulting to 100;
+    pass the last UUID of a page as `after` to get the next one.
+    """
+    tasks = await task_crud.get_tasks(
+        overdue=overdue,
+        tags=normalize_tags(tags),
+        match_all_tags=tag_match == "all",
+        after=after,
+        limit=limit
+    )
     return tasks
 
 @app.get("/tasks/{task_uuid}", response_model=TaskResponse)
@@ -49,6 +89,43 @@ async def read_task(
         )
     return task
 
+@app.get("/tasks/{task_uuid}/subtree", response_model=List[TaskTreeNode])
+async def read_task_subtree(
+    task_uuid: uuid.UUID,
+    max_depth: int = Query(MAX_TREE_DEPTH, ge=0, le=MAX_TREE_DEPTH),
+    task_crud: TaskCRUD = Depends(get_task_crud)
+):
+    """Get a task with its subtasks, each with status counts of its own subtree"""
+    nodes = await task_crud.get_subtree(task_uuid, max_depth)
+    if not nodes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    counts = subtree_status_counts(nodes)
+    return [
+        TaskTreeNode(
+            **TaskResponse.model_validate(task).model_dump(),
+            depth=depth,
+            status_counts=counts[task.uuid]
+        )
+        for task, depth, _ in nodes
+    ]
+
+@app.get("/tasks/{task_uuid}/path", response_model=List[TaskResponse])
+async def read_task_path(
+    task_uuid: uuid.UUID,
+    task_crud: TaskCRUD = Depends(get_task_crud)
+):
+    """Get the chain of tasks from the root down to a specific task"""
+    path = await task_crud.get_path(task_uuid)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    return path
+
 @app.put("/tasks/{task_uuid}", response_model=TaskResponse)
 async def update_task(
     task_uuid: uuid.UUID,
@@ -56,7 +133,13 @@ async def update_task(
     task_crud: TaskCRUD = Depends(get_task_crud)
 ):
     """Update a task"""
-    task = await task_crud.update_task(task_uuid, task_update)
+    try:
+        task = await task_crud.update_task(task_uuid, task_update)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(error)
+        )
     if task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -77,3 +160,22 @@ async def delete_task(
             detail="Task not found"
         )
     return None
+
+@app.get(
+    "/debug/queries",
+    response_model=QueryDiagnosticsResponse,
+    dependencies=[Depends(require_debug_token)]
+)
+async def read_query_diagnostics():
+    """Get recorded slow queries and N+1 warnings"""
+    return query_diagnostics.snapshot()
+
+@app.delete(
+    "/debug/queries",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_debug_token)]
+)
+async def reset_query_diagnostics():
+    """Clear recorded slow queries and N+1 warnings"""
+    query_diagnostics.reset()
+    return None
@@ -1,10 +1,12 @@
-from sqlalchemy import String, func
-from sqlalchemy.orm import Mapped, mapped_column
-from uuid import UUID, uuid4
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Table, func, literal_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from uuid import UUID
 from datetime import datetime
+from typing import Optional
 from enum import Enum
 
 from src.database import Base
+from src.ids import new_task_uuid
 
 
 class TaskStatus(str, Enum):
@@ -13,15 +15,46 @@ class TaskStatus(str, Enum):
     COMPLETED = "completed"
 
 
+task_tags = Table(
+    "TaskTags",
+    Base.metadata,
+    Column("task_uuid", ForeignKey("Tasks.uuid", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", ForeignKey("Tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_TaskTags_tag_id_task_uuid", "tag_id", "task_uuid"),
+)
+
+
+class Tag(Base):
+    __tablename__ = "Tags"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"Tag(id={self.id}, name={self.name})"
+
+
 class Task(Base):
     __tablename__ = "Tasks"
 
-    uuid: Mapped[UUID] = mapped_column(unique=True, primary_key=True, default=uuid4)
+    uuid: Mapped[UUID] = mapped_column(unique=True, primary_key=True, default=new_task_uuid)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=True)
     status: Mapped[TaskStatus] = mapped_column(String, default=TaskStatus.CREATED, nullable=False)
+    due_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    parent_uuid: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("Tasks.uuid", ondelete="SET NULL"), nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(default=func.now(), onupdate=func.now(), nullable=False)
+    # Loaded for a whole result set with one extra IN query, never lazily per task
+    tags: Mapped[list[Tag]] = relationship(secondary=task_tags, lazy="selectin", order_by=Tag.name)
 
     def __repr__(self):
-        return f"Task(uuid={self.uuid}, title={self.title}, status={self.status})"
\ No newline at end of file
+        return f"Task(uuid={self.uuid}, title={self.title}, status={self.status})"
+
+
+# Rendered as a literal so the planner can match it against the partial index predicate
+OPEN_TASK = Task.status != literal_column(f"'{TaskStatus.COMPLETED.value}'")
+
+Index("ix_tasks_open_due_at", Task.due_at, postgresql_where=OPEN_TASK, sqlite_where=OPEN_TASK)
@@ -0,0 +1,223 @@
+import asyncio
+import heapq
+import inspect
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from src.database import AsyncSessionLocal
+from src.models import Task, OPEN_TASK, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineEvent(NamedTuple):
+    task_uuid: UUID
+    due_at: datetime
+
+
+DeadlineCallback = Callable[[DeadlineEvent], Any]
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class DeadlineScheduler:
+    """Fires callbacks when task deadlines pass.
+
+    Only deadlines up to ``horizon`` are kept in memory, in a heap ordered by ``due_at``.
+    When the horizon is reached the next window is loaded through the open-tasks index.
+    Changes made in between are applied with ``schedule``/``unschedule``; entries that
+    were moved or removed stay in the heap and are skipped when popped. Changes made while
+    a window is loading are buffered and replayed once it is merged, since the query may
+    not see them. Due deadlines are checked against the database before callbacks run,
+    as other processes may have completed or deleted the task.
+
+    The first window also picks up open tasks whose deadline passed while no scheduler
+    was running, going back at most ``catch_up`` (no limit when ``None``).
+    """
+
+    def __init__(
+            self,
+            session_factory=AsyncSessionLocal,
+            window: timedelta = timedelta(hours=1),
+            catch_up: Optional[timedelta] = None,
+            retry_delay: float = 30.0
+    ):
+        self.session_factory = session_factory
+        self.window = window
+        self.catch_up = catch_up
+        self.retry_delay = retry_delay
+        self.horizon: Optional[datetime] = None
+        self._heap: list[tuple[datetime, UUID]] = []
+        self._deadlines: dict[UUID, datetime] = {}
+        self._loading = False
+        self._pending: dict[UUID, Optional[datetime]] = {}
+        self._callbacks: list[DeadlineCallback] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "DeadlineScheduler":
+        catch_up = os.getenv("DEADLINE_CATCH_UP_SECONDS")
+        return cls(
+            window=timedelta(seconds=float(os.getenv("DEADLINE_WINDOW_SECONDS", "3600"))),
+            catch_up=timedelta(seconds=float(catch_up)) if catch_up else None
+        )
+
+    def subscribe(self, callback: DeadlineCallback) -> None:
+        self._callbacks.append(callback)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.horizon = None
+        self._loading = False
+        self._heap.clear()
+        self._deadlines.clear()
+        self._pending.clear()
+
+    def schedule(self, task: Task) -> None:
+        """Track the current deadline of a created or updated task"""
+        if task.due_at is None or task.status == TaskStatus.COMPLETED:
+            self._set_deadline(task.uuid, None)
+        else:
+            self._set_deadline(task.uuid, _as_utc(task.due_at))
+
+    def unschedule(self, task_uuid: UUID) -> None:
+        self._set_deadline(task_uuid, None)
+
+    def _set_deadline(self, task_uuid: UUID, due_at: Optional[datetime]) -> None:
+        if self._loading:
+            self._pending[task_uuid] = due_at
+            return
+        if due_at is None or self.horizon is None or due_at > self.horizon:
+            # Without a horizon nothing is loaded yet; the first load reads committed changes
+            self._deadlines.pop(task_uuid, None)
+            return
+        if self._deadlines.get(task_uuid) == due_at:
+            return
+        self._deadlines[task_uuid] = due_at
+        heapq.heappush(self._heap, (due_at, task_uuid))
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            now = _utcnow()
+            try:
+                if self.horizon is None or now >= self.horizon:
+                    await self._load_window(now)
+                await self._fire_due(now)
+            except Exception:
+                logger.exception("Failed to process deadlines")
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            next_wakeup = self.horizon
+            if self._heap and self._heap[0][0] < next_wakeup:
+                next_wakeup = self._heap[0][0]
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=max((next_wakeup - _utcnow()).total_seconds(), 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _load_window(self, now: datetime) -> None:
+        end = now + self.window
+        query = select(Task.uuid, Task.due_at).where(OPEN_TASK, Task.due_at <= end)
+        # The first load also reads past deadlines, missed while no scheduler was running;
+        # they are due already and fire right away
+        if self.horizon is not None:
+            query = query.where(Task.due_at > self.horizon)
+        elif self.catch_up is not None:
+            query = query.where(Task.due_at > now - self.catch_up)
+        self._loading = True
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(query.order_by(Task.due_at))
+                rows = result.all()
+        finally:
+            self._loading = False
+            pending, self._pending = self._pending, {}
+
+        self.horizon = end
+        for task_uuid, due_at in rows:
+            due_at = _as_utc(due_at)
+            self._deadlines[task_uuid] = due_at
+            heapq.heappush(self._heap, (due_at, task_uuid))
+        for task_uuid, due_at in pending.items():
+            self._set_deadline(task_uuid, due_at)
+
+    async def _fire_due(self, now: datetime) -> None:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, task_uuid = heapq.heappop(self._heap)
+            if self._deadlines.get(task_uuid) != due_at:
+                continue
+            del self._deadlines[task_uuid]
+            due.append(DeadlineEvent(task_uuid, due_at))
+        if not due:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(Task.uuid, Task.due_at)
+                    .where(OPEN_TASK, Task.uuid.in_([deadline.task_uuid for deadline in due]))
+                )
+                current = {task_uuid: _as_utc(due_at) for task_uuid, due_at in result.all() if due_at is not None}
+        except Exception:
+            for deadline in due:
+                self._deadlines.setdefault(deadline.task_uuid, deadline.due_at)
+                heapq.heappush(self._heap, (deadline.due_at, deadline.task_uuid))
+            raise
+
+        for deadline in due:
+            if deadline.task_uuid not in current:
+                continue
+            if current[deadline.task_uuid] == deadline.due_at:
+                await self._notify(deadline)
+            else:
+                # Moved by another process without this scheduler being told
+                self._set_deadline(deadline.task_uuid, current[deadline.task_uuid])
+
+    async def _notify(self, deadline: DeadlineEvent) -> None:
+        for callback in self._callbacks:
+            try:
+                result = callback(deadline)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Deadline callback failed for task %s", deadline.task_uuid)
+
+
+def log_overdue(deadline: DeadlineEvent) -> None:
+    logger.warning("Task %s is overdue since %s", deadline.task_uuid, deadline.due_at.isoformat())
+
+
+deadline_scheduler = DeadlineScheduler.from_env()
+deadline_scheduler.subscribe(log_overdue)
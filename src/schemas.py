@@ -1,15 +1,32 @@
 import uuid
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Any, Optional
 from datetime import datetime
 
 from .models import TaskStatus
 
 
+TagName = Annotated[str, Field(min_length=1, max_length=64)]
+
+
+def normalize_tags(tags):
+    """Accept tag names or Tag models, strip names and drop duplicates keeping order"""
+    if tags is None:
+        return None
+    names = [getattr(tag, "name", tag) for tag in tags]
+    names = [name.strip() if isinstance(name, str) else name for name in names]
+    return list(dict.fromkeys(names))
+
+
 class TaskBase(BaseModel):
     title: str = Field(min_length=1, max_length=255)
     description: Optional[str] = None
     status: TaskStatus = TaskStatus.CREATED
+    due_at: Optional[datetime] = None
+    parent_uuid: Optional[uuid.UUID] = None
+    tags: list[TagName] = []
+
+    _normalize_tags = field_validator("tags", mode="before")(normalize_tags)
 
 
 class TaskCreate(TaskBase):
@@ -20,6 +37,11 @@ class TaskUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
+    due_at: Optional[datetime] = None
+    parent_uuid: Optional[uuid.UUID] = None
+    tags: Optional[list[TagName]] = None
+
+    _normalize_tags = field_validator("tags", mode="before")(normalize_tags)
 
 
 class TaskInDB(TaskBase):
@@ -31,4 +53,31 @@ class TaskInDB(TaskBase):
         from_attributes = True
 
 class TaskResponse(TaskInDB):
-    pass
\ No newline at end of file
+    pass
+
+
+class TaskTreeNode(TaskResponse):
+    depth: int
+    status_counts: dict[TaskStatus, int]
+
+
+class SlowQuery(BaseModel):
+    statement: str
+    parameters: Any
+    duration_ms: float
+    plan: Optional[list[str]] = None
+    recorded_at: datetime
+
+
+class NPlusOneWarning(BaseModel):
+    request: str
+    statement: str
+    count: int
+    recorded_at: datetime
+
+
+class QueryDiagnosticsResponse(BaseModel):
+    slow_query_threshold_ms: float
+    n_plus_one_threshold: int
+    slow_queries: list[SlowQuery]
+    n_plus_one_warnings: list[NPlusOneWarning]
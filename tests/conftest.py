@@ -1,4 +1,5 @@
 import pytest
+import pytest_asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
@@ -12,35 +13,44 @@ from datetime import datetime
 from src.main import app
 from src.schemas import TaskResponse, TaskCreate, TaskUpdate
 from src.crud import TaskCRUD
+from src.database import Base
 
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
 
 
-@pytest.fixture(scope="session")
+@pytest_asyncio.fixture
 async def database_engine():
     """Фикстура для тестовой базы данных"""
     engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     yield engine
     await engine.dispose()
 
 
 @pytest.fixture
-async def async_session(database_engine):
-    """Фикстура для асинхронной сессии"""
-    async with database_engine.begin() as conn:
-        from src.models import Base
-        await conn.run_sync(Base.metadata.create_all)
-
-    async_session = sessionmaker(
+def session_factory(database_engine):
+    """Фикстура для фабрики сессий тестовой базы данных"""
+    return sessionmaker(
         database_engine, class_=AsyncSession, expire_on_commit=False
     )
 
-    async with async_session() as session:
+
+@pytest_asyncio.fixture
+async def async_session(session_factory):
+    """Фикстура для асинхронной сессии"""
+    async with session_factory() as session:
         yield session
 
 
+@pytest.fixture
+def db_task_crud(async_session):
+    """Фикстура для TaskCRUD поверх тестовой базы данных"""
+    return TaskCRUD(async_session)
+
+
 import pytest
 from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
@@ -86,6 +96,7 @@ def mock_task_object(sample_task_response):
     mock_task.title = sample_task_response["title"]
     mock_task.description = sample_task_response["description"]
     mock_task.status = sample_task_response["status"]
+    mock_task.parent_uuid = None
     return mock_task
 
 
@@ -1,9 +1,10 @@
 import pytest
 import uuid
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.schemas import TaskCreate, TaskUpdate
-from src.models import Task
+from src.models import Task, TaskStatus
 from src.crud import TaskCRUD
 
 
@@ -239,3 +240,47 @@ async def test_delete_task_failure(task_crud, async_session):
     async_session.commit.assert_awaited_once()
     assert result is False
 
+
+
+@pytest.mark.asyncio
+async def test_create_task_schedules_deadline(async_session):
+    """Тест регистрации дедлайна новой задачи в планировщике"""
+    scheduler = MagicMock()
+    task_crud = TaskCRUD(async_session, scheduler)
+    task_data = TaskCreate(title="Test Task", due_at="2030-01-01T00:00:00Z")
+
+    result = await task_crud.create_task(task_data)
+
+    scheduler.schedule.assert_called_once_with(result)
+    assert result.due_at == task_data.due_at
+
+
+@pytest.mark.asyncio
+async def test_delete_task_unschedules_deadline(async_session):
+    """Тест удаления дедлайна из планировщика"""
+    scheduler = MagicMock()
+    task_crud = TaskCRUD(async_session, scheduler)
+    task_uuid = uuid.uuid4()
+
+    await task_crud.delete_task(task_uuid)
+
+    scheduler.unschedule.assert_called_once_with(task_uuid)
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_overdue(session_factory):
+    """Тест фильтра просроченных задач на тестовой базе данных"""
+    now = datetime.now(timezone.utc)
+    async with session_factory() as session:
+        session.add_all([
+            Task(title="later overdue", due_at=now - timedelta(hours=1)),
+            Task(title="earlier overdue", due_at=now - timedelta(days=1), status=TaskStatus.IN_PROGRESS),
+            Task(title="completed", due_at=now - timedelta(days=2), status=TaskStatus.COMPLETED),
+            Task(title="future", due_at=now + timedelta(days=1)),
+            Task(title="undated"),
+        ])
+        await session.commit()
+
+        tasks = await TaskCRUD(session).get_tasks(overdue=True)
+
+    assert [task.title for task in tasks] == ["earlier overdue", "later overdue"]
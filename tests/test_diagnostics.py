@@ -0,0 +1,101 @@
+import pytest
+from fastapi import status
+from sqlalchemy import text
+
+from src.diagnostics import QueryDiagnostics, fingerprint, parameters_shape, query_diagnostics
+
+
+def test_fingerprint_ignores_parameters():
+    """Statements differing only in parameters share a fingerprint"""
+    assert fingerprint('SELECT * FROM "Tasks" WHERE uuid = $1') == fingerprint(
+        'SELECT *\n  FROM "Tasks" WHERE uuid = ?'
+    )
+    assert fingerprint("SELECT 1 WHERE x IN (?, ?, ?)") == fingerprint("SELECT 1 WHERE x IN (?)")
+
+
+def test_parameters_shape_hides_values():
+    """Only parameter types are recorded"""
+    assert parameters_shape(("secret", 1)) == ["str", "int"]
+    assert parameters_shape({"title": "secret"}) == {"title": "str"}
+
+
+@pytest.mark.asyncio
+async def test_slow_query_recorded_with_plan(database_engine):
+    """Statements over the threshold are logged with their plan"""
+    diagnostics = QueryDiagnostics(slow_query_threshold_ms=0, explain=True)
+    diagnostics.install(database_engine)
+
+    async with database_engine.connect() as conn:
+        result = await conn.execute(text("SELECT 1 WHERE 1 = :x"), {"x": 1})
+        assert result.scalar_one() == 1
+
+    assert len(diagnostics.slow_queries) == 1
+    slow_query = diagnostics.slow_queries[0]
+    assert slow_query["parameters"] == ["int"]
+    assert slow_query["plan"]
+
+
+@pytest.mark.asyncio
+async def test_n_plus_one_warning(database_engine):
+    """Repeating the same statement within one request is reported"""
+    diagnostics = QueryDiagnostics(n_plus_one_threshold=3)
+    diagnostics.install(database_engine)
+
+    with diagnostics.track_request("GET /tasks/") as queries:
+        async with database_engine.connect() as conn:
+            for value in range(5):
+                await conn.execute(text("SELECT :x"), {"x": value})
+
+    assert sum(queries.values()) == 5
+    assert len(diagnostics.n_plus_one_warnings) == 1
+    assert diagnostics.n_plus_one_warnings[0]["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_releases_start_time(database_engine):
+    """Failed statements do not leave timing state on the pooled connection"""
+    diagnostics = QueryDiagnostics()
+    diagnostics.install(database_engine)
+
+    async with database_engine.connect() as conn:
+        with pytest.raises(Exception):
+            await conn.execute(text("SELECT * FROM missing_table"))
+        start_times = await conn.run_sync(lambda sync_conn: sync_conn.info.get("query_start_time"))
+
+    assert start_times == []
+
+
+class TestDebugQueriesEndpoint:
+    def test_disabled_without_token(self, client, monkeypatch):
+        """Endpoint is hidden when no debug token is configured"""
+        monkeypatch.delenv("DEBUG_TOKEN", raising=False)
+
+        response = client.get("/debug/queries")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_wrong_token(self, client, monkeypatch):
+        monkeypatch.setenv("DEBUG_TOKEN", "secret")
+
+        response = client.get("/debug/queries", headers={"X-Debug-Token": "wrong"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_snapshot(self, client, monkeypatch):
+        monkeypatch.setenv("DEBUG_TOKEN", "secret")
+        query_diagnostics.reset()
+
+        response = client.get("/debug/queries", headers={"X-Debug-Token": "secret"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["slow_queries"] == []
+        assert response.headers["X-Query-Count"] == "0"
+
+    def test_query_count_header_requires_token(self, client, mock_task_crud, override_dependency, monkeypatch):
+        """Query counts are not exposed to clients without the debug token"""
+        monkeypatch.setenv("DEBUG_TOKEN", "secret")
+        mock_task_crud.get_tasks.return_value = []
+
+        assert "X-Query-Count" not in client.get("/tasks/").headers
+        assert "X-Query-Count" not in client.get("/tasks/", headers={"X-Debug-Token": "wrong"}).headers
+        assert "X-Query-Count" in client.get("/tasks/", headers={"X-Debug-Token": "secret"}).headers
@@ -0,0 +1,67 @@
+import time
+import uuid
+
+import pytest
+
+from src import ids
+from src.crud import DEFAULT_PAGE_SIZE
+from src.models import Task
+from src.schemas import TaskCreate
+
+
+def test_uuid7_layout():
+    """Version, variant and timestamp follow RFC 9562"""
+    before_ms = time.time_ns() // 1_000_000
+    value = ids.uuid7()
+    after_ms = time.time_ns() // 1_000_000
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before_ms <= value.int >> 80 <= after_ms + 1
+
+
+def test_uuid7_strictly_increasing():
+    values = [ids.uuid7() for _ in range(10_000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_new_task_uuid_version(monkeypatch):
+    monkeypatch.setattr(ids, "TASK_UUID_VERSION", 4)
+    assert ids.new_task_uuid().version == 4
+
+    monkeypatch.setattr(ids, "TASK_UUID_VERSION", 7)
+    assert ids.new_task_uuid().version == 7
+
+
+@pytest.mark.parametrize("value", ["v7", "6", ""])
+def test_invalid_task_uuid_version(monkeypatch, value):
+    monkeypatch.setenv("TASK_UUID_VERSION", value)
+
+    with pytest.raises(ValueError, match="TASK_UUID_VERSION must be 4 or 7"):
+        ids._task_uuid_version()
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_follows_insert_order(db_task_crud, monkeypatch):
+    """With UUIDv7 keys, pages ordered by primary key come back in insert order"""
+    monkeypatch.setattr(ids, "TASK_UUID_VERSION", 7)
+    for number in range(5):
+        await db_task_crud.create_task(TaskCreate(title=f"Task {number}"))
+
+    first_page = await db_task_crud.get_tasks(limit=3)
+    second_page = await db_task_crud.get_tasks(after=first_page[-1].uuid, limit=3)
+
+    assert [task.title for task in first_page + second_page] == [f"Task {number}" for number in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_default_page_size(db_task_crud):
+    """A cursor without a limit still returns a bounded page"""
+    db_task_crud.session.add_all([Task(title=f"Task {number}") for number in range(DEFAULT_PAGE_SIZE + 1)])
+    await db_task_crud.session.commit()
+
+    page = await db_task_crud.get_tasks(after=uuid.UUID(int=0))
+
+    assert len(page) == DEFAULT_PAGE_SIZE
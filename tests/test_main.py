@@ -1,4 +1,6 @@
 import uuid
+from collections import Counter
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 from fastapi import status
 from fastapi.testclient import TestClient
@@ -7,6 +9,7 @@ import pytest
 from src.main import app
 from src.schemas import TaskCreate, TaskUpdate, TaskResponse
 from src.crud import TaskCRUD
+from src.models import Task
 
 
 
@@ -51,6 +54,45 @@ class TestReadTasks:
         assert response.json() == []
         mock_task_crud.get_tasks.assert_called_once()
 
+    def test_read_tasks_overdue(self, client, mock_task_crud, override_dependency):
+        """Test that the overdue filter is passed to the CRUD layer"""
+        mock_task_crud.get_tasks.return_value = []
+
+        response = client.get("/tasks/?overdue=true")
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_task_crud.get_tasks.assert_called_once_with(
+            overdue=True, tags=None, match_all_tags=False, after=None, limit=None
+        )
+
+    def test_read_tasks_by_tags(self, client, mock_task_crud, override_dependency):
+        """Test that repeated tags are normalized like stored ones and passed with the match mode"""
+        mock_task_crud.get_tasks.return_value = []
+
+        response = client.get("/tasks/?tags=%20backend&tags=urgent&tags=backend&tag_match=all")
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_task_crud.get_tasks.assert_called_once_with(
+            overdue=False, tags=["backend", "urgent"], match_all_tags=True, after=None, limit=None
+        )
+
+    def test_read_tasks_page(self, client, mock_task_crud, override_dependency):
+        """Test that keyset pagination parameters are passed to the CRUD layer"""
+        mock_task_crud.get_tasks.return_value = []
+        after = uuid.uuid4()
+
+        response = client.get(f"/tasks/?after={after}&limit=50")
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_task_crud.get_tasks.assert_called_once_with(
+            overdue=False, tags=None, match_all_tags=False, after=after, limit=50
+        )
+
+    def test_read_tasks_invalid_tag_match(self, client, override_dependency):
+        response = client.get("/tasks/?tags=backend&tag_match=some")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
 
 class TestReadTask:
     def test_read_task_not_found(
@@ -73,6 +115,48 @@ class TestReadTask:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
+class TestTaskTree:
+    def test_read_subtree(self, client, mock_task_crud, override_dependency):
+        """Test subtree nodes carry depth and subtree status counts"""
+        root = Task(uuid=uuid.uuid4(), title="Root", status="created",
+                    created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1))
+        child = Task(uuid=uuid.uuid4(), title="Child", status="completed", parent_uuid=root.uuid,
+                     created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1))
+        mock_task_crud.get_subtree.return_value = [(root, 0, Counter()), (child, 1, Counter())]
+
+        response = client.get(f"/tasks/{root.uuid}/subtree?max_depth=3")
+
+        assert response.status_code == status.HTTP_200_OK
+        nodes = response.json()
+        assert [node["depth"] for node in nodes] == [0, 1]
+        assert nodes[0]["status_counts"] == {"created": 1, "in_progress": 0, "completed": 1}
+        assert nodes[1]["parent_uuid"] == str(root.uuid)
+        mock_task_crud.get_subtree.assert_called_once_with(root.uuid, 3)
+
+    def test_read_subtree_not_found(self, client, mock_task_crud, override_dependency):
+        mock_task_crud.get_subtree.return_value = []
+
+        response = client.get(f"/tasks/{uuid.uuid4()}/subtree")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_read_path_not_found(self, client, mock_task_crud, override_dependency):
+        mock_task_crud.get_path.return_value = []
+
+        response = client.get(f"/tasks/{uuid.uuid4()}/path")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_update_task_cycle(self, client, mock_task_crud, override_dependency):
+        """Test moving a task under its own subtree is rejected"""
+        mock_task_crud.update_task.side_effect = ValueError("Task cannot be moved under its own subtree")
+
+        response = client.put(f"/tasks/{uuid.uuid4()}", json={"parent_uuid": str(uuid.uuid4())})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"] == "Task cannot be moved under its own subtree"
+
+
 class TestUpdateTask:
     def test_update_task_success(
             self, client, mock_task_crud, override_dependency, sample_task_response
@@ -87,6 +171,7 @@ class TestUpdateTask:
         mock_updated_task.title = "Updated Task"
         mock_updated_task.description = "Test Description"
         mock_updated_task.status = "completed"
+        mock_updated_task.parent_uuid = None
 
         mock_task_crud.update_task.return_value = mock_updated_task
 
@@ -127,6 +212,7 @@ class TestUpdateTask:
         mock_updated_task.title = "Test Task"  # Оригинальное значение
         mock_updated_task.description = "Test Description"  # Оригинальное значение
         mock_updated_task.status = "completed"  # Обновленное значение
+        mock_updated_task.parent_uuid = None
 
         mock_task_crud.update_task.return_value = mock_updated_task
 
@@ -0,0 +1,161 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from src.models import Task, TaskStatus
+from src.scheduler import DeadlineEvent, DeadlineScheduler
+
+
+async def add_task(session_factory, **fields) -> Task:
+    async with session_factory() as session:
+        task = Task(title="Task", **fields)
+        session.add(task)
+        await session.commit()
+        return task
+
+
+async def wait_for(events, count, timeout=2.0):
+    async def poll():
+        while len(events) < count:
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def wait_for_load(scheduler, timeout=2.0):
+    async def poll():
+        while scheduler.horizon is None:
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_fires_deadlines_from_loaded_window(session_factory):
+    """Deadlines inside the window fire in order, completed and distant ones do not"""
+    now = datetime.now(timezone.utc)
+    first = await add_task(session_factory, due_at=now + timedelta(milliseconds=300))
+    second = await add_task(session_factory, due_at=now + timedelta(milliseconds=400))
+    await add_task(session_factory, due_at=now + timedelta(milliseconds=300), status=TaskStatus.COMPLETED)
+    await add_task(session_factory, due_at=now + timedelta(days=1))
+
+    scheduler = DeadlineScheduler(session_factory, window=timedelta(minutes=1))
+    events = []
+    scheduler.subscribe(events.append)
+    await scheduler.start()
+    try:
+        await wait_for(events, 2)
+        await asyncio.sleep(0.1)
+    finally:
+        await scheduler.stop()
+
+    assert [event.task_uuid for event in events] == [first.uuid, second.uuid]
+
+
+@pytest.mark.asyncio
+async def test_fires_deadlines_missed_before_start(session_factory):
+    """Open tasks already overdue at startup fire on the first load, within the catch-up period"""
+    now = datetime.now(timezone.utc)
+    missed = await add_task(session_factory, due_at=now - timedelta(minutes=5))
+    await add_task(session_factory, due_at=now - timedelta(minutes=5), status=TaskStatus.COMPLETED)
+    await add_task(session_factory, due_at=now - timedelta(days=2))
+
+    scheduler = DeadlineScheduler(session_factory, window=timedelta(minutes=1), catch_up=timedelta(days=1))
+    events = []
+    scheduler.subscribe(events.append)
+    await scheduler.start()
+    try:
+        await wait_for(events, 1)
+        await asyncio.sleep(0.1)
+    finally:
+        await scheduler.stop()
+
+    assert events == [DeadlineEvent(missed.uuid, missed.due_at)]
+
+
+@pytest.mark.asyncio
+async def test_schedule_reschedules_and_unschedules(session_factory):
+    """Changed deadlines replace the loaded ones without reloading the window"""
+    scheduler = DeadlineScheduler(session_factory, window=timedelta(minutes=1))
+    events = []
+    scheduler.subscribe(events.append)
+    await scheduler.start()
+    try:
+        await wait_for_load(scheduler)
+        now = datetime.now(timezone.utc)
+        moved = await add_task(session_factory, due_at=now + timedelta(milliseconds=150))
+        removed = await add_task(session_factory, due_at=now + timedelta(milliseconds=50))
+        scheduler.schedule(Task(uuid=moved.uuid, title="Moved", status=TaskStatus.CREATED,
+                                due_at=now + timedelta(milliseconds=50)))
+        scheduler.schedule(removed)
+
+        scheduler.schedule(moved)
+        scheduler.unschedule(removed.uuid)
+
+        await wait_for(events, 1)
+        await asyncio.sleep(0.1)
+    finally:
+        await scheduler.stop()
+
+    assert len(events) == 1
+    assert events[0].task_uuid == moved.uuid
+    assert events[0].due_at == moved.due_at
+
+
+@pytest.mark.asyncio
+async def test_schedule_during_load_is_replayed(session_factory):
+    """Deadlines scheduled while a window is loading are not dropped"""
+    scheduler = DeadlineScheduler(session_factory, window=timedelta(minutes=1))
+    now = datetime.now(timezone.utc)
+    task = Task(uuid=uuid.uuid4(), title="Task", status=TaskStatus.CREATED,
+                due_at=now + timedelta(seconds=30))
+
+    load = asyncio.create_task(scheduler._load_window(now))
+    await asyncio.sleep(0)
+    scheduler.schedule(task)
+    await load
+
+    assert scheduler._deadlines == {task.uuid: task.due_at}
+
+
+@pytest.mark.asyncio
+async def test_rechecks_database_before_firing(session_factory):
+    """Tasks completed or moved by another process are not reported at the old deadline"""
+    now = datetime.now(timezone.utc)
+    completed = await add_task(session_factory, due_at=now + timedelta(milliseconds=500))
+    moved = await add_task(session_factory, due_at=now + timedelta(milliseconds=500))
+
+    scheduler = DeadlineScheduler(session_factory, window=timedelta(minutes=1))
+    events = []
+    scheduler.subscribe(events.append)
+    await scheduler.start()
+    try:
+        await wait_for_load(scheduler)
+        assert set(scheduler._deadlines) == {completed.uuid, moved.uuid}
+        async with session_factory() as session:
+            await session.execute(
+                update(Task).where(Task.uuid == completed.uuid).values(status=TaskStatus.COMPLETED)
+            )
+            await session.execute(
+                update(Task).where(Task.uuid == moved.uuid).values(due_at=now + timedelta(milliseconds=700))
+            )
+            await session.commit()
+
+        await wait_for(events, 1)
+        await asyncio.sleep(0.1)
+    finally:
+        await scheduler.stop()
+
+    assert events == [DeadlineEvent(moved.uuid, now + timedelta(milliseconds=700))]
+
+
+def test_schedule_ignores_deadlines_beyond_horizon():
+    scheduler = DeadlineScheduler(window=timedelta(minutes=1))
+    scheduler.horizon = datetime.now(timezone.utc) + timedelta(minutes=1)
+    task = Task(uuid=uuid.uuid4(), title="Later", status=TaskStatus.CREATED,
+                due_at=scheduler.horizon + timedelta(seconds=1))
+
+    scheduler.schedule(task)
+
+    assert scheduler._deadlines == {}
@@ -0,0 +1,91 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from src.schemas import TaskCreate, TaskResponse, TaskUpdate
+
+
+@pytest_asyncio.fixture
+async def tagged_tasks(db_task_crud):
+    await db_task_crud.create_task(TaskCreate(title="both", tags=["backend", "urgent"]))
+    await db_task_crud.create_task(TaskCreate(title="backend", tags=["backend"]))
+    await db_task_crud.create_task(TaskCreate(title="urgent", tags=["urgent"]))
+    await db_task_crud.create_task(TaskCreate(title="untagged"))
+
+
+def test_tags_normalized():
+    """Тест нормализации тегов"""
+    task = TaskCreate(title="Task", tags=[" backend", "backend ", "urgent"])
+
+    assert task.tags == ["backend", "urgent"]
+
+
+def test_blank_tag_rejected():
+    with pytest.raises(ValueError):
+        TaskCreate(title="Task", tags=["  "])
+
+
+@pytest.mark.asyncio
+async def test_filter_any_tag(db_task_crud, tagged_tasks):
+    tasks = await db_task_crud.get_tasks(tags=["backend", "urgent"])
+
+    assert {task.title for task in tasks} == {"both", "backend", "urgent"}
+
+
+@pytest.mark.asyncio
+async def test_filter_all_tags(db_task_crud, tagged_tasks):
+    tasks = await db_task_crud.get_tasks(tags=["backend", "urgent"], match_all_tags=True)
+
+    assert [task.title for task in tasks] == ["both"]
+
+
+@pytest.mark.asyncio
+async def test_list_loads_tags_in_one_batch(database_engine, db_task_crud, tagged_tasks):
+    """Тест загрузки тегов одним запросом на всю страницу"""
+    statements = []
+    event.listen(database_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    tasks = await db_task_crud.get_tasks()
+    responses = [TaskResponse.model_validate(task) for task in tasks]
+
+    assert len(statements) == 2
+    assert {response.title: response.tags for response in responses}["both"] == ["backend", "urgent"]
+
+
+@pytest.mark.asyncio
+async def test_update_replaces_tags(db_task_crud):
+    task = await db_task_crud.create_task(TaskCreate(title="Task", tags=["backend"]))
+
+    updated = await db_task_crud.update_task(task.uuid, TaskUpdate(tags=["frontend", "backend"]))
+
+    assert {tag.name for tag in updated.tags} == {"backend", "frontend"}
+    assert await db_task_crud.get_tasks(tags=["frontend"]) == [updated]
+
+
+@pytest.mark.asyncio
+async def test_new_tag_added_concurrently(database_engine, db_task_crud):
+    """Тест тега, созданного другим запросом между проверкой и вставкой"""
+    inserted = []
+
+    def insert_competing_tag(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO "Tags"') and not inserted:
+            inserted.append(True)
+            competing = conn.connection.dbapi_connection.cursor()
+            competing.execute("INSERT INTO \"Tags\" (name) VALUES ('fresh')")
+            competing.close()
+
+    event.listen(database_engine.sync_engine, "before_cursor_execute", insert_competing_tag)
+
+    task = await db_task_crud.create_task(TaskCreate(title="Task", tags=["fresh"]))
+
+    assert [tag.name for tag in task.tags] == ["fresh"]
+    assert task.tags[0].id is not None
+
+
+@pytest.mark.asyncio
+async def test_new_tag_on_unsupported_dialect(db_task_crud, monkeypatch):
+    """Missing tags are only inserted on dialects with ON CONFLICT DO NOTHING"""
+    monkeypatch.setattr(db_task_crud.session.get_bind().dialect, "name", "mysql")
+
+    with pytest.raises(NotImplementedError):
+        await db_task_crud.create_task(TaskCreate(title="Task", tags=["fresh"]))
@@ -0,0 +1,106 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, update
+
+from src.crud import subtree_status_counts
+from src.models import Task, TaskStatus
+from src.schemas import TaskCreate, TaskUpdate
+
+
+@pytest_asyncio.fixture
+async def tree(db_task_crud):
+    """root -> (a -> (a1, a2), b)"""
+    root = await db_task_crud.create_task(TaskCreate(title="root"))
+    a = await db_task_crud.create_task(TaskCreate(title="a", parent_uuid=root.uuid, status=TaskStatus.IN_PROGRESS))
+    b = await db_task_crud.create_task(TaskCreate(title="b", parent_uuid=root.uuid, status=TaskStatus.COMPLETED))
+    a1 = await db_task_crud.create_task(TaskCreate(title="a1", parent_uuid=a.uuid, status=TaskStatus.COMPLETED))
+    a2 = await db_task_crud.create_task(TaskCreate(title="a2", parent_uuid=a.uuid))
+    return {task.title: task for task in (root, a, b, a1, a2)}
+
+
+@pytest.mark.asyncio
+async def test_get_subtree_single_query(database_engine, db_task_crud, tree):
+    """Subtree is read with one statement and ordered by depth"""
+    statements = []
+    event.listen(database_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    nodes = await db_task_crud.get_subtree(tree["root"].uuid)
+
+    assert len(statements) == 1
+    assert [depth for _, depth, _ in nodes] == [0, 1, 1, 2, 2]
+    assert {task.title for task, _, _ in nodes} == set(tree)
+
+
+@pytest.mark.asyncio
+async def test_get_subtree_max_depth(db_task_crud, tree):
+    nodes = await db_task_crud.get_subtree(tree["root"].uuid, max_depth=1)
+
+    assert {task.title for task, _, _ in nodes} == {"root", "a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_subtree_status_counts(db_task_crud, tree):
+    counts = subtree_status_counts(await db_task_crud.get_subtree(tree["root"].uuid))
+
+    assert counts[tree["root"].uuid] == {
+        TaskStatus.CREATED: 2, TaskStatus.IN_PROGRESS: 1, TaskStatus.COMPLETED: 2
+    }
+    assert counts[tree["a"].uuid] == {
+        TaskStatus.CREATED: 1, TaskStatus.IN_PROGRESS: 1, TaskStatus.COMPLETED: 1
+    }
+
+
+@pytest.mark.asyncio
+async def test_subtree_status_counts_include_nodes_below_max_depth(db_task_crud, tree):
+    """Counts cover the whole subtree even when the returned nodes are cut off"""
+    nodes = await db_task_crud.get_subtree(tree["root"].uuid, max_depth=1)
+    counts = subtree_status_counts(nodes)
+
+    assert {task.title for task, _, _ in nodes} == {"root", "a", "b"}
+    assert counts[tree["root"].uuid] == {
+        TaskStatus.CREATED: 2, TaskStatus.IN_PROGRESS: 1, TaskStatus.COMPLETED: 2
+    }
+    assert counts[tree["a"].uuid] == {
+        TaskStatus.CREATED: 1, TaskStatus.IN_PROGRESS: 1, TaskStatus.COMPLETED: 1
+    }
+
+    nodes = await db_task_crud.get_subtree(tree["root"].uuid, max_depth=0)
+    assert subtree_status_counts(nodes)[tree["root"].uuid][TaskStatus.COMPLETED] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_path(database_engine, db_task_crud, tree):
+    """Path is read with one statement, tags included"""
+    statements = []
+    event.listen(database_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    path = await db_task_crud.get_path(tree["a2"].uuid)
+
+    assert len(statements) == 1
+    assert [task.title for task in path] == ["root", "a", "a2"]
+
+
+@pytest.mark.asyncio
+async def test_update_rejects_cycle(db_task_crud, tree):
+    with pytest.raises(ValueError):
+        await db_task_crud.update_task(tree["root"].uuid, TaskUpdate(parent_uuid=tree["a1"].uuid))
+
+    moved = await db_task_crud.update_task(tree["a1"].uuid, TaskUpdate(parent_uuid=tree["b"].uuid))
+    assert moved.parent_uuid == tree["b"].uuid
+
+
+@pytest.mark.asyncio
+async def test_corrupted_cycle_is_walked_once(db_task_crud, tree):
+    """A cycle left by concurrent moves does not repeat tasks in subtree or path"""
+    await db_task_crud.session.execute(
+        update(Task).where(Task.uuid == tree["root"].uuid).values(parent_uuid=tree["a"].uuid)
+    )
+    await db_task_crud.session.commit()
+
+    nodes = await db_task_crud.get_subtree(tree["root"].uuid)
+    counts = subtree_status_counts(nodes)
+    path = await db_task_crud.get_path(tree["a2"].uuid)
+
+    assert sorted(task.title for task, _, _ in nodes) == sorted(tree)
+    assert sum(counts[tree["root"].uuid].values()) == len(tree)
+    assert [task.title for task in path] == ["root", "a", "a2"]